@@ -1,447 +1,666 @@
-import streamlit as st
-from lxml import etree
-from pathlib import Path
-from io import BytesIO
-from collections import defaultdict
-
-NS = {'tei': 'http://www.tei-c.org/ns/1.0'}
-
-def parse_xml(file_path):
-    """Parses an XML file and returns the tree."""
-    try:
-        parser = etree.XMLParser(remove_blank_text=True)
-        tree = etree.parse(str(file_path), parser)
-        return tree
-    except Exception as e:
-        st.error(f"Error parsing XML file `{file_path.name}`: {e}")
-        return None
-
-def get_all_authors(parsed_trees):
-    """Extracts all unique authors from the list of XML trees."""
-    authors = set()
-    for tree in parsed_trees:       
-        # From bibliography
-        bib_authors = tree.xpath('//tei:bibl/tei:author/tei:persName', namespaces=NS)
-        for author in bib_authors:
-            if author.text:
-                authors.add(author.text.strip())
-    return sorted(authors)
-
-def get_all_keywords(parsed_trees):
-    """Extracts all unique keywords from the list of XML trees."""
-    keywords = set()
-    for tree in parsed_trees:
-        keyword_items = tree.xpath('//tei:keywords/tei:list/tei:item', namespaces=NS)
-        for item in keyword_items:
-            if item.text:                
-                parts = [kw.strip() for kw in item.text.split(',')]
-                keywords.update(parts)
-    return sorted(keywords)
-
-def get_all_place_names(parsed_trees):
-    """Extracts all unique place names from the list of XML trees."""
-    places = set()
-    for tree in parsed_trees:       
-        provenance_places = tree.xpath('//tei:provenance/tei:placeName', namespaces=NS)
-        for place in provenance_places:
-            if place.text and place.text.lower() != 'none':
-                places.add(place.text.strip())        
-        
-        location_names = tree.xpath('//tei:location/tei:name[@type="place"]', namespaces=NS)
-        for name in location_names:
-            if name.text and name.text.lower() != 'none':
-                places.add(name.text.strip())        
-        
-        contemporary_names = tree.xpath('//tei:div[@type="commentary"]//tei:name[@type="contemporary"]', namespaces=NS)
-        for name in contemporary_names:
-            if name.text and name.text.lower() != 'none':
-                places.add(name.text.strip())        
-        
-        current_names = tree.xpath('//tei:name[@type="current"]', namespaces=NS)
-        for name in current_names:
-            if name.text and name.text.lower() != 'none':
-                places.add(name.text.strip())
-    return sorted(places)
-
-def build_author_mappings(parsed_trees, xml_files):
-    """
-    Builds mappings from authors to their associated places and keywords.
-    
-    Returns:
-        author_to_places (dict): Maps each author to a set of associated places.
-        author_to_keywords (dict): Maps each author to a set of associated keywords.
-    """
-    author_to_places = defaultdict(set)
-    author_to_keywords = defaultdict(set)
-    
-    for tree in parsed_trees:
-        # Extract authors
-        authors = set()        
-        bib_authors = tree.xpath('//tei:bibl/tei:author/tei:persName', namespaces=NS)
-        for author in bib_authors:
-            if author.text:
-                authors.add(author.text.strip())
-        
-        # Extract places
-        places = set()
-        provenance_places = tree.xpath('//tei:provenance/tei:placeName', namespaces=NS)
-        for place in provenance_places:
-            if place.text and place.text.lower() != 'none':
-                places.add(place.text.strip())
-        
-        location_names = tree.xpath('//tei:location/tei:name[@type="place"]', namespaces=NS)
-        for name in location_names:
-            if name.text and name.text.lower() != 'none':
-                places.add(name.text.strip())
-        
-        contemporary_names = tree.xpath('//tei:div[@type="commentary"]//tei:name[@type="contemporary"]', namespaces=NS)
-        for name in contemporary_names:
-            if name.text and name.text.lower() != 'none':
-                places.add(name.text.strip())
-        
-        current_names = tree.xpath('//tei:name[@type="current"]', namespaces=NS)
-        for name in current_names:
-            if name.text and name.text.lower() != 'none':
-                places.add(name.text.strip())        
-        
-        keywords = set()
-        keyword_items = tree.xpath('//tei:keywords/tei:list/tei:item', namespaces=NS)
-        for item in keyword_items:
-            if item.text:
-                parts = [kw.strip() for kw in item.text.split(',')]
-                keywords.update(parts)        
-       
-        for author in authors:
-            author_to_places[author].update(places)
-            author_to_keywords[author].update(keywords)
-    
-    return author_to_places, author_to_keywords
-
-def get_commentary(tree):
-    """Extracts commentary sections from a single XML tree."""
-    commentaries = tree.xpath('//tei:div[@type="commentary"]', namespaces=NS)
-    commentary_list = []
-    for comm in commentaries:
-        subtype = comm.get('subtype', 'general')
-        content = etree.tostring(comm, pretty_print=True, encoding='unicode')
-        commentary_list.append({'subtype': subtype, 'content': content})
-    return commentary_list
-
-def get_editions(tree):
-    """Extracts edition sections from a single XML tree."""
-    editions = tree.xpath('//tei:div[@type="edition"]', namespaces=NS)
-    edition_list = []
-    for edition in editions:
-        
-        lang = edition.get('{http://www.w3.org/XML/1998/namespace}lang', 'unknown')        
-        content = etree.tostring(edition, pretty_print=True, encoding='unicode')
-        edition_list.append({'lang': lang, 'content': content})
-    return edition_list
-
-def search_by_author(tree, author_query):
-    """Searches for the author in titleStmt and bibliography."""
-    results = []       
-    
-    bib_authors = tree.xpath('//tei:bibl/tei:author/tei:persName', namespaces=NS)
-    for author in bib_authors:
-        if author.text and author_query.lower() in author.text.lower():
-            results.append(f"Bibliography Author: {author.text}")
-    return results
-
-def search_by_place(tree, place_query):
-    """
-    Searches for the place in provenance, contemporary names, and location geo elements.
-    
-    Parameters:
-        tree (etree.Element): Parsed XML tree.
-        place_query (str): The place name to search for.
-    
-    Returns:
-        list: A list of strings describing where the place was found.
-    """
-    results = []
-    place_query_lower = place_query.lower()    
-   
-    provenance_places = tree.xpath('//tei:provenance/tei:placeName', namespaces=NS)
-    for place in provenance_places:
-        if place.text and place_query_lower in place.text.lower() and place.text.lower() != "none":
-            results.append(f"Provenance Place: {place.text.strip()}")
-  
-    contemporary_names = tree.xpath(
-        '//tei:div[@type="commentary" and @subtype="general"]//tei:name[@type="contemporary"]',
-        namespaces=NS
-    )
-    for name in contemporary_names:
-        if name.text and place_query_lower in name.text.lower():
-            results.append(f"Contemporary Name: {name.text.strip()}")    
-   
-    geo_elements = tree.xpath('//tei:location//tei:geo', namespaces=NS)
-    for geo in geo_elements:
-        if geo.text and place_query_lower in geo.text.lower() and geo.text.lower() != "none":
-            results.append(f"Location Geo: {geo.text.strip()}")
-    
-    return results
-
-def search_by_keyword(tree, keyword):
-    """Searches for the keyword in keywords and commentary segments."""
-    results = []   
-    keyword_items = tree.xpath('//tei:keywords/tei:list/tei:item', namespaces=NS)
-    for item in keyword_items:
-        if item.text and keyword.lower() in item.text.lower():
-            results.append(f"Keyword: {item.text}")    
-    commentary_segs = tree.xpath('//tei:div[@type="commentary"]//tei:seg', namespaces=NS)
-    for seg in commentary_segs:
-        if seg.text and keyword.lower() in seg.text.lower():
-            results.append(f"Commentary Segment: {seg.text}")
-    return results
-
-def display_tei_header(tree):
-    title = tree.xpath('//tei:teiHeader/tei:fileDesc/tei:titleStmt/tei:title', namespaces=NS)
-    author = tree.xpath('//tei:teiHeader/tei:fileDesc/tei:titleStmt/tei:author/tei:persName', namespaces=NS)
-    publication = tree.xpath('//tei:teiHeader/tei:fileDesc/tei:publicationStmt/tei:publisher', namespaces=NS)
-    date = tree.xpath('//tei:teiHeader/tei:fileDesc/tei:publicationStmt/tei:date', namespaces=NS)
-
-    if title:
-        st.write(f"**Title:** {title[0].text}")
-    if author:
-        st.write(f"**Author:** {author[0].text}")
-    if publication:
-        st.write(f"**Publisher:** {publication[0].text}")
-    if date:
-        st.write(f"**Date:** {date[0].text}")
-
-def display_code_wrapped(content):
-    """
-    Custom function to display code with wrapping using st.markdown and HTML.
-    This avoids horizontal scrolling by wrapping long lines.
-    """
-    st.markdown(
-        f"""
-        <div style="white-space: pre-wrap; word-wrap: break-word; font-size:14px; background-color: #f5f5f5; padding: 10px; border-radius: 5px; overflow: hidden;">
-            <code>{content}</code>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-
-def main():    
-    st.set_page_config(page_title="DigitalSEE TEI XML Viewer", layout="wide")   
-   
-    st.markdown(
-        """
-        <style>
-        /* Enable code wrapping in st.code blocks */
-        pre, code {
-            white-space: pre-wrap !important; /* Allows wrapping */
-            word-wrap: break-word !important;  /* Breaks long words */
-            overflow-x: hidden !important;     /* Hides horizontal scrollbar */
-        }
-        /* Adjust font size for better fit */
-        .streamlit-expanderHeader, pre, code {
-            font-size: 14px !important;
-        }
-        /* Ensure the container doesn't force a minimum width */
-        .streamlit-expander, .block-container {
-            max-width: 100% !important;
-        }
-        /* Optional: Style for the code background */
-        pre {
-            background-color: #f5f5f5 !important;
-            padding: 10px !important;
-            border-radius: 5px !important;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
-
-    st.title("📄 DigitalSEE TEI XML Viewer")
-
-    
-    xml_folder = Path("./xmls")  
-
-    if not xml_folder.exists() or not xml_folder.is_dir():
-        st.error(f"The specified folder `{xml_folder}` does not exist or is not a directory.")
-        st.stop()
-
-    xml_files = list(xml_folder.glob("*.xml"))
-    if not xml_files:
-        st.info(f"No XML files found in the folder `{xml_folder}`.")
-        st.stop()
-
-    st.sidebar.header("📂 XML Files Overview")
-    st.sidebar.write(f"**Total XML Files Loaded:** {len(xml_files)}")
-
-    parsed_trees = []
-    valid_files = []
-    for file in xml_files:
-        tree = parse_xml(file)
-        if tree is not None:
-            parsed_trees.append(tree)
-            valid_files.append(file)
-
-    if not parsed_trees:
-        st.error("No valid XML files were parsed successfully.")
-        st.stop()
-
-    all_authors = get_all_authors(parsed_trees)
-    all_keywords = get_all_keywords(parsed_trees)
-    all_place_names = get_all_place_names(parsed_trees)
-
-    author_to_places, author_to_keywords = build_author_mappings(parsed_trees, valid_files)
-
-    st.header("🔍 Search TEI XML Files")
-
-    search_col1, search_col2, search_col3 = st.columns(3)
-
-    with search_col1:
-        st.markdown("**Search by Author**")
-        selected_author = st.selectbox("Select Author", options=["-- Select Author --"] + all_authors, key="author_select")
-
-    if selected_author != "-- Select Author --":
-        filtered_places = sorted(author_to_places[selected_author])
-        filtered_keywords = sorted(author_to_keywords[selected_author])
-    else:
-        filtered_places = all_place_names
-        filtered_keywords = all_keywords
-
-    with search_col2:
-        st.markdown("**Search by Place Name**")
-        selected_place = st.selectbox("Select Place", options=["-- Select Place --"] + filtered_places, key="place_select")
-
-    with search_col3:
-        st.markdown("**Search by Keyword**")
-        selected_keyword = st.selectbox("Select Keyword", options=["-- Select Keyword --"] + filtered_keywords, key="keyword_select")
-
-    
-    if st.button("🔎 Search"):
-        st.subheader("🔗 Search Results")
-
-        matched_files = set(valid_files)  
-
-        
-        if selected_author != "-- Select Author --":
-            author_matched = set()
-            for tree, file in zip(parsed_trees, valid_files):
-                if search_by_author(tree, selected_author):
-                    author_matched.add(file)
-            matched_files = matched_files.intersection(author_matched)
-        
-        
-        if selected_place != "-- Select Place --":
-            place_matched = set()
-            for tree, file in zip(parsed_trees, valid_files):
-                if search_by_place(tree, selected_place):
-                    place_matched.add(file)
-            matched_files = matched_files.intersection(place_matched)
-        
-        
-        if selected_keyword != "-- Select Keyword --":
-            keyword_matched = set()
-            for tree, file in zip(parsed_trees, valid_files):
-                if search_by_keyword(tree, selected_keyword):
-                    keyword_matched.add(file)
-            matched_files = matched_files.intersection(keyword_matched)        
-        
-        if matched_files:
-            st.write(f"**Total Matches:** {len(matched_files)}")
-            for file in matched_files:
-                tree = parse_xml(file)  
-                if tree is not None:
-                    with st.expander(f"📄 {file.name}"):
-                        display_tei_header(tree)
-                        
-                        commentaries = get_commentary(tree)
-                        if commentaries:
-                            st.markdown("**Commentary Sections:**")
-                            for idx, comm in enumerate(commentaries, start=1):
-                                st.markdown(f"**Commentary {idx} - {comm['subtype']}**")
-                                st.code(comm['content'], language='xml')
-                              
-                        else:
-                            st.write("No commentary sections found.")
-
-                        editions = get_editions(tree)
-                        if editions:
-                            st.markdown("**Edition Sections:**")
-                            for idx, edition in enumerate(editions, start=1):
-                                st.markdown(f"**Edition {idx} - Language: {edition['lang']}**")
-                                st.code(edition['content'], language='xml')
-                                
-                        else:
-                            st.write("No edition sections found.")
-
-                        associated_places = sorted(author_to_places.get(selected_author, set())) if selected_author != "-- Select Author --" else sorted(get_all_place_names([tree]))
-                        associated_keywords = sorted(author_to_keywords.get(selected_author, set())) if selected_author != "-- Select Author --" else sorted(get_all_keywords([tree]))
-
-                        if associated_places:
-                            st.markdown("**Associated Places:**")
-                            st.write(", ".join(associated_places))
-                        if associated_keywords:
-                            st.markdown("**Associated Keywords:**")
-                            st.write(", ".join(associated_keywords))
-
-                        
-                        buffer = BytesIO()
-                        tree.write(buffer, pretty_print=True, encoding='utf-8', xml_declaration=True)
-                        buffer.seek(0)
-                        st.download_button(
-                            label="📥 Download XML",
-                            data=buffer,
-                            file_name=f"matched_{file.name}",
-                            mime="application/xml"
-                        )
-        else:
-            st.write("No matching files found for the given search criteria.")
-
-    with st.expander("📚 View All Loaded XML Files"):
-        for tree, file in zip(parsed_trees, valid_files):
-            with st.container():
-                st.markdown(f"### 📄 {file.name}")
-                display_tei_header(tree)
-
-                commentaries = get_commentary(tree)
-                if commentaries:
-                    st.markdown("**Commentary Sections:**")
-                    for idx, comm in enumerate(commentaries, start=1):
-                        st.markdown(f"**Commentary {idx} - {comm['subtype']}**")
-                        st.code(comm['content'], language='xml')
-              
-                else:
-                    st.write("No commentary sections found.")
-
-                editions = get_editions(tree)
-                if editions:
-                    st.markdown("**Edition Sections:**")
-                    for idx, edition in enumerate(editions, start=1):
-                        st.markdown(f"**Edition {idx} - Language: {edition['lang']}**")
-                        st.code(edition['content'], language='xml')
-                       
-                else:
-                    st.write("No edition sections found.")
-
-    st.sidebar.markdown("---")      
-    st.sidebar.header("Simple Querying Interface")
-    st.sidebar.write(
-        "Quickly search and filter TEI XML files to find relevant information or themes."
-    )
-
-    st.sidebar.header("XML Code Viewer")
-    st.sidebar.write(
-        "View detailed XML code for commentaries and editions in their original format."
-    )
-
-    st.sidebar.header("Downloadable Entries")
-    st.sidebar.write(
-        "Download entries for offline access and further analysis."
-    )
-
-    st.sidebar.header("Comprehensive Meta Information")
-    st.sidebar.write(
-        "Each entry includes rich metadata, such as XML file author details."
-    )
-
-  
-
-if __name__ == "__main__":
-    main()
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from lxml import etree
+from pathlib import Path
+from io import BytesIO
+from collections import defaultdict
+
+_TEI_NS = 'http://www.tei-c.org/ns/1.0'
+NS = {'tei': _TEI_NS}
+
+# Namespace-qualified tags for the C-level tree.iter()/iterparse scans below.
+# Interned so the == comparisons against elem.tag in the hot loops hit the
+# pointer-identity fast path whenever lxml hands back an identical string.
+_TAG_PERSNAME = sys.intern(f'{{{_TEI_NS}}}persName')
+_TAG_AUTHOR = sys.intern(f'{{{_TEI_NS}}}author')
+_TAG_BIBL = sys.intern(f'{{{_TEI_NS}}}bibl')
+_TAG_ITEM = sys.intern(f'{{{_TEI_NS}}}item')
+_TAG_LIST = sys.intern(f'{{{_TEI_NS}}}list')
+_TAG_KEYWORDS = sys.intern(f'{{{_TEI_NS}}}keywords')
+_TAG_PLACENAME = sys.intern(f'{{{_TEI_NS}}}placeName')
+_TAG_NAME = sys.intern(f'{{{_TEI_NS}}}name')
+_TAG_PROVENANCE = sys.intern(f'{{{_TEI_NS}}}provenance')
+_TAG_LOCATION = sys.intern(f'{{{_TEI_NS}}}location')
+_TAG_DIV = sys.intern(f'{{{_TEI_NS}}}div')
+
+# Tags the streaming extractor subscribes to; everything else is skipped
+# inside libxml2.
+_STREAM_TAGS = (_TAG_PERSNAME, _TAG_ITEM, _TAG_PLACENAME, _TAG_NAME)
+
+# XPath expressions compiled once at import time so libxml2 does not have to
+# re-parse them for every tree they are evaluated against.
+_XP_KEYWORD_ITEMS = etree.XPath('//tei:keywords/tei:list/tei:item', namespaces=NS)
+
+# Predicate rejecting empty and placeholder 'none' values inside libxml2,
+# so Python never sees the nodes. XPath 1.0 has no lower-case(), hence the
+# translate() spelling.
+_P_NOT_NONE = ("[normalize-space(.) and not(translate(normalize-space(.), "
+               "'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')='none')]")
+
+_XP_PROVENANCE_PLACES = etree.XPath('//tei:provenance/tei:placeName' + _P_NOT_NONE, namespaces=NS)
+
+# All four place-name sources unioned into one expression, so extraction is
+# a single libxml2 traversal instead of four.
+_XP_ALL_PLACES = etree.XPath(' | '.join(path + _P_NOT_NONE for path in (
+    '//tei:provenance/tei:placeName',
+    '//tei:location/tei:name[@type="place"]',
+    '//tei:div[@type="commentary"]//tei:name[@type="contemporary"]',
+    '//tei:name[@type="current"]',
+)), namespaces=NS)
+_XP_COMMENTARIES = etree.XPath('//tei:div[@type="commentary"]', namespaces=NS)
+_XP_EDITIONS = etree.XPath('//tei:div[@type="edition"]', namespaces=NS)
+_XP_COMMENTARY_CONTEMPORARY = etree.XPath(
+    '//tei:div[@type="commentary" and @subtype="general"]//tei:name[@type="contemporary"]',
+    namespaces=NS
+)
+_XP_LOCATION_GEO = etree.XPath('//tei:location//tei:geo', namespaces=NS)
+_XP_COMMENTARY_SEGS = etree.XPath('//tei:div[@type="commentary"]//tei:seg', namespaces=NS)
+# Absolute paths from the root: libxml2 walks straight down the known TEI
+# structure instead of scanning every descendant for a match.
+_XP_HEADER_TITLE = etree.XPath('/tei:TEI/tei:teiHeader/tei:fileDesc/tei:titleStmt/tei:title', namespaces=NS)
+_XP_HEADER_AUTHOR = etree.XPath('/tei:TEI/tei:teiHeader/tei:fileDesc/tei:titleStmt/tei:author/tei:persName', namespaces=NS)
+_XP_HEADER_PUBLISHER = etree.XPath('/tei:TEI/tei:teiHeader/tei:fileDesc/tei:publicationStmt/tei:publisher', namespaces=NS)
+_XP_HEADER_DATE = etree.XPath('/tei:TEI/tei:teiHeader/tei:fileDesc/tei:publicationStmt/tei:date', namespaces=NS)
+
+def _split_keywords(texts):
+    """Tokenizes comma-separated keyword strings into a set of stripped terms."""
+    # map(str.strip, ...) over a batch of texts stays on the C level instead
+    # of re-entering Python bytecode per keyword.
+    return {kw for text in texts for kw in map(str.strip, text.split(',')) if kw}
+
+def _parse_tree(path_str):
+    """Parses an XML file. Streamlit-free, so it is safe in worker threads."""
+    # XMLParser instances are not thread-safe, so each call builds its own.
+    # collect_ids=False skips the xml:id hash table (getElementById is never
+    # used) and resolve_entities=False skips entity substitution; the TEI
+    # files carry no DTD, so remove_blank_text would add a pass for nothing.
+    parser = etree.XMLParser(collect_ids=False, resolve_entities=False, huge_tree=True)
+    return etree.parse(path_str, parser)
+
+@st.cache_resource(show_spinner=False)
+def _load_tree(path_str, mtime):
+    """Parses an XML file, cached on (path, mtime) so reruns reuse the tree."""
+    return _parse_tree(path_str)
+
+def _stream_extract(path_str):
+    """
+    Extracts (authors, keywords, places) from one file with etree.iterparse.
+
+    The indexing phase only needs a handful of tagged text nodes, not a full
+    DOM, so this streams the document and clears each visited element, keeping
+    peak memory at O(current element) instead of one tree per file.
+    """
+    authors = set()
+    keyword_texts = []
+    places = set()
+    for _event, elem in etree.iterparse(path_str, events=('end',), tag=_STREAM_TAGS,
+                                        collect_ids=False, resolve_entities=False,
+                                        huge_tree=True):
+        tag = elem.tag
+        text = elem.text
+        if tag == _TAG_PERSNAME:
+            parent = elem.getparent()
+            if (text and parent is not None and parent.tag == _TAG_AUTHOR
+                    and parent.getparent() is not None
+                    and parent.getparent().tag == _TAG_BIBL):
+                authors.add(text.strip())
+        elif tag == _TAG_ITEM:
+            parent = elem.getparent()
+            if (text and parent is not None and parent.tag == _TAG_LIST
+                    and parent.getparent() is not None
+                    and parent.getparent().tag == _TAG_KEYWORDS):
+                keyword_texts.append(text)
+        elif tag == _TAG_PLACENAME:
+            cleaned = _clean(text)
+            parent = elem.getparent()
+            if cleaned and parent is not None and parent.tag == _TAG_PROVENANCE:
+                places.add(cleaned)
+        else:  # _TAG_NAME
+            cleaned = _clean(text)
+            if cleaned:
+                name_type = elem.get('type')
+                if name_type == 'current':
+                    places.add(cleaned)
+                elif name_type == 'place':
+                    parent = elem.getparent()
+                    if parent is not None and parent.tag == _TAG_LOCATION:
+                        places.add(cleaned)
+                elif name_type == 'contemporary':
+                    ancestor = elem.getparent()
+                    while ancestor is not None:
+                        if ancestor.tag == _TAG_DIV and ancestor.get('type') == 'commentary':
+                            places.add(cleaned)
+                            break
+                        ancestor = ancestor.getparent()
+        # Reclaim the element and already-processed preceding siblings.
+        elem.clear(keep_tail=True)
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+    return authors, _split_keywords(keyword_texts), places
+
+def _stream_extract_or_error(path_str):
+    """Wraps _stream_extract for executor.map, trading exceptions for messages."""
+    try:
+        return _stream_extract(path_str), None
+    except Exception as e:
+        return None, f"Error parsing XML file `{Path(path_str).name}`: {e}"
+
+# Text values treated as empty by the extraction helpers.
+_SKIP = frozenset({'', 'none'})
+
+def _clean(text):
+    """Strips element text, returning None for empty or placeholder values."""
+    if not text:
+        return None
+    text = text.strip()
+    if text.lower() in _SKIP:
+        return None
+    return text
+
+def parse_xml(file_path):
+    """Parses an XML file and returns the tree."""
+    try:
+        return _load_tree(str(file_path), file_path.stat().st_mtime)
+    except Exception as e:
+        st.error(f"Error parsing XML file `{file_path.name}`: {e}")
+        return None
+
+@st.cache_resource(show_spinner="Loading XML files...")
+def load_all(files_key):
+    """
+    Streams every XML file and builds the derived author/keyword/place data.
+
+    Cached on (path, mtime) pairs so Streamlit reruns reuse the indices
+    instead of re-reading the whole folder on every widget click. Indexing
+    never builds a DOM; full trees are parsed (and cached) on demand for the
+    files the user actually views.
+
+    Returns:
+        valid_files (list): Paths that were read successfully.
+        author_to_places (dict): Maps each author to a sorted list of associated places.
+        author_to_keywords (dict): Maps each author to a sorted list of associated keywords.
+        author_to_files (dict): Maps each author to the set of files citing them.
+        place_to_files (dict): Maps each place to the set of files mentioning it.
+        keyword_to_files (dict): Maps each keyword to the set of files tagged with it.
+        all_authors (list): Sorted unique authors.
+        all_keywords (list): Sorted unique keywords.
+        all_place_names (list): Sorted unique place names.
+        errors (list): Messages for files that failed to parse.
+    """
+    # iterparse releases the GIL for most of its work, so streaming the
+    # folder in a thread pool overlaps disk I/O and C-level parsing.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = list(executor.map(_stream_extract_or_error, (path_str for path_str, _ in files_key)))
+
+    extracted_per_file = []
+    valid_files = []
+    errors = []
+    for (path_str, _mtime), (sets, error) in zip(files_key, results):
+        if sets is not None:
+            file = Path(path_str)
+            valid_files.append(file)
+            extracted_per_file.append((file, *sets))
+        else:
+            errors.append(error)
+
+    (authors, keywords, places, author_to_places, author_to_keywords,
+     author_to_files, place_to_files, keyword_to_files) = extract_all(extracted_per_file)
+
+    # Sort once here, inside the cache, so widget interactions never re-sort.
+    author_to_places = {a: sorted(p) for a, p in author_to_places.items()}
+    author_to_keywords = {a: sorted(k) for a, k in author_to_keywords.items()}
+
+    return (valid_files, author_to_places, author_to_keywords,
+            author_to_files, place_to_files, keyword_to_files,
+            sorted(authors), sorted(keywords), sorted(places), errors)
+
+def _extract_authors(tree):
+    """Extracts the set of bibliography authors from a single XML tree."""
+    # tree.iter() is a C-level scan; checking the parent chain in Python is
+    # cheaper than an XPath '//' descendant search for a name-only match.
+    authors = set()
+    for pers in tree.iter(_TAG_PERSNAME):
+        parent = pers.getparent()
+        if parent is None or parent.tag != _TAG_AUTHOR:
+            continue
+        grandparent = parent.getparent()
+        if grandparent is None or grandparent.tag != _TAG_BIBL:
+            continue
+        if pers.text:
+            authors.add(pers.text.strip())
+    return authors
+
+def _extract_keywords(tree):
+    """Extracts the set of keywords from a single XML tree."""
+    texts = []
+    for item in tree.iter(_TAG_ITEM):
+        parent = item.getparent()
+        if parent is None or parent.tag != _TAG_LIST:
+            continue
+        grandparent = parent.getparent()
+        if grandparent is None or grandparent.tag != _TAG_KEYWORDS:
+            continue
+        if item.text:
+            texts.append(item.text)
+    return _split_keywords(texts)
+
+def _extract_places(tree):
+    """Extracts the set of place names from a single XML tree."""
+    return {c for c in (_clean(node.text) for node in _XP_ALL_PLACES(tree)) if c}
+
+def get_all_authors(parsed_trees):
+    """Extracts all unique authors from the list of XML trees."""
+    authors = set()
+    for tree in parsed_trees:
+        authors |= _extract_authors(tree)
+    return sorted(authors)
+
+def get_all_keywords(parsed_trees):
+    """Extracts all unique keywords from the list of XML trees."""
+    keywords = set()
+    for tree in parsed_trees:
+        keywords |= _extract_keywords(tree)
+    return sorted(keywords)
+
+def get_all_place_names(parsed_trees):
+    """Extracts all unique place names from the list of XML trees."""
+    places = set()
+    for tree in parsed_trees:
+        places |= _extract_places(tree)
+    return sorted(places)
+
+def _intern_mask(values, ids, id_to_value):
+    """Interns values to dense integer ids and returns their combined bitmask."""
+    mask = 0
+    for value in values:
+        idx = ids.get(value)
+        if idx is None:
+            idx = len(id_to_value)
+            ids[value] = idx
+            id_to_value.append(value)
+        mask |= 1 << idx
+    return mask
+
+def _decode_mask(mask, id_to_value):
+    """Expands a bitmask back into the set of interned values."""
+    result = set()
+    idx = 0
+    while mask:
+        if mask & 1:
+            result.add(id_to_value[idx])
+        mask >>= 1
+        idx += 1
+    return result
+
+def extract_all(extracted_per_file):
+    """
+    Aggregates per-file (file, authors, keywords, places) extraction results.
+
+    Fills the global sets, the per-author mappings, and the inverted
+    term -> files indices in a single pass over the per-file results.
+
+    Returns:
+        all_authors (set): All unique authors.
+        all_keywords (set): All unique keywords.
+        all_places (set): All unique place names.
+        author_to_places (dict): Maps each author to a set of associated places.
+        author_to_keywords (dict): Maps each author to a set of associated keywords.
+        author_to_files (dict): Maps each author to the set of files citing them.
+        place_to_files (dict): Maps each place to the set of files mentioning it.
+        keyword_to_files (dict): Maps each keyword to the set of files tagged with it.
+    """
+    all_authors = set()
+    author_to_files = defaultdict(set)
+    place_to_files = defaultdict(set)
+    keyword_to_files = defaultdict(set)
+
+    # Places and keywords are interned to dense integer ids so the per-author
+    # accumulation is a bitwise OR on one int per file instead of hashing the
+    # same strings into many sets.
+    place_id = {}
+    keyword_id = {}
+    id_to_place = []
+    id_to_keyword = []
+    author_place_bits = defaultdict(int)
+    author_keyword_bits = defaultdict(int)
+
+    for file, authors, keywords, places in extracted_per_file:
+        all_authors |= authors
+        place_mask = _intern_mask(places, place_id, id_to_place)
+        keyword_mask = _intern_mask(keywords, keyword_id, id_to_keyword)
+        for author in authors:
+            author_place_bits[author] |= place_mask
+            author_keyword_bits[author] |= keyword_mask
+            author_to_files[author].add(file)
+        for place in places:
+            place_to_files[place].add(file)
+        for keyword in keywords:
+            keyword_to_files[keyword].add(file)
+
+    author_to_places = {a: _decode_mask(m, id_to_place) for a, m in author_place_bits.items()}
+    author_to_keywords = {a: _decode_mask(m, id_to_keyword) for a, m in author_keyword_bits.items()}
+
+    return (all_authors, set(id_to_keyword), set(id_to_place), author_to_places, author_to_keywords,
+            author_to_files, place_to_files, keyword_to_files)
+
+def get_commentary(tree):
+    """Extracts commentary sections from a single XML tree."""
+    nodes = _XP_COMMENTARIES(tree)
+    subtypes = [node.get('subtype', 'general') for node in nodes]
+    # The viewer's CSS pre-wraps the XML, so the indentation pass that
+    # pretty_print would add is pure overhead.
+    contents = [etree.tostring(node, encoding='unicode') for node in nodes]
+    return [{'subtype': s, 'content': c} for s, c in zip(subtypes, contents)]
+
+def get_editions(tree):
+    """Extracts edition sections from a single XML tree."""
+    nodes = _XP_EDITIONS(tree)
+    langs = [node.get('{http://www.w3.org/XML/1998/namespace}lang', 'unknown') for node in nodes]
+    contents = [etree.tostring(node, encoding='unicode') for node in nodes]
+    return [{'lang': l, 'content': c} for l, c in zip(langs, contents)]
+
+def search_by_place(tree, place_query):
+    """
+    Searches for the place in provenance, contemporary names, and location geo elements.
+    
+    Parameters:
+        tree (etree.Element): Parsed XML tree.
+        place_query (str): The place name to search for.
+    
+    Returns:
+        list: A list of strings describing where the place was found.
+    """
+    results = []
+    pattern = re.compile(re.escape(place_query), re.IGNORECASE)
+
+    for place in _XP_PROVENANCE_PLACES(tree):
+        text = _clean(place.text)
+        if text and pattern.search(text):
+            results.append(f"Provenance Place: {text}")
+
+    for name in _XP_COMMENTARY_CONTEMPORARY(tree):
+        if name.text and pattern.search(name.text):
+            results.append(f"Contemporary Name: {name.text.strip()}")
+
+    for geo in _XP_LOCATION_GEO(tree):
+        text = _clean(geo.text)
+        if text and pattern.search(text):
+            results.append(f"Location Geo: {text}")
+
+    return results
+
+def search_by_keyword(tree, keyword):
+    """Searches for the keyword in keywords and commentary segments."""
+    results = []
+    pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+    for item in _XP_KEYWORD_ITEMS(tree):
+        if item.text and pattern.search(item.text):
+            results.append(f"Keyword: {item.text}")
+    for seg in _XP_COMMENTARY_SEGS(tree):
+        if seg.text and pattern.search(seg.text):
+            results.append(f"Commentary Segment: {seg.text}")
+    return results
+
+def display_tei_header(tree):
+    title = _XP_HEADER_TITLE(tree)
+    author = _XP_HEADER_AUTHOR(tree)
+    publication = _XP_HEADER_PUBLISHER(tree)
+    date = _XP_HEADER_DATE(tree)
+
+    if title:
+        st.write(f"**Title:** {title[0].text}")
+    if author:
+        st.write(f"**Author:** {author[0].text}")
+    if publication:
+        st.write(f"**Publisher:** {publication[0].text}")
+    if date:
+        st.write(f"**Date:** {date[0].text}")
+
+def display_code_wrapped(content):
+    """
+    Custom function to display code with wrapping using st.markdown and HTML.
+    This avoids horizontal scrolling by wrapping long lines.
+    """
+    st.markdown(
+        f"""
+        <div style="white-space: pre-wrap; word-wrap: break-word; font-size:14px; background-color: #f5f5f5; padding: 10px; border-radius: 5px; overflow: hidden;">
+            <code>{content}</code>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+def main():    
+    st.set_page_config(page_title="DigitalSEE TEI XML Viewer", layout="wide")   
+   
+    st.markdown(
+        """
+        <style>
+        /* Enable code wrapping in st.code blocks */
+        pre, code {
+            white-space: pre-wrap !important; /* Allows wrapping */
+            word-wrap: break-word !important;  /* Breaks long words */
+            overflow-x: hidden !important;     /* Hides horizontal scrollbar */
+        }
+        /* Adjust font size for better fit */
+        .streamlit-expanderHeader, pre, code {
+            font-size: 14px !important;
+        }
+        /* Ensure the container doesn't force a minimum width */
+        .streamlit-expander, .block-container {
+            max-width: 100% !important;
+        }
+        /* Optional: Style for the code background */
+        pre {
+            background-color: #f5f5f5 !important;
+            padding: 10px !important;
+            border-radius: 5px !important;
+        }
+        </style>
+        """,
+        unsafe_allow_html=True
+    )
+
+    st.title("📄 DigitalSEE TEI XML Viewer")
+
+    
+    xml_folder = Path("./xmls")  
+
+    if not xml_folder.exists() or not xml_folder.is_dir():
+        st.error(f"The specified folder `{xml_folder}` does not exist or is not a directory.")
+        st.stop()
+
+    xml_files = list(xml_folder.glob("*.xml"))
+    if not xml_files:
+        st.info(f"No XML files found in the folder `{xml_folder}`.")
+        st.stop()
+
+    st.sidebar.header("📂 XML Files Overview")
+    st.sidebar.write(f"**Total XML Files Loaded:** {len(xml_files)}")
+
+    files_key = tuple((str(file), file.stat().st_mtime) for file in xml_files)
+    (valid_files, author_to_places, author_to_keywords,
+     author_to_files, place_to_files, keyword_to_files,
+     all_authors, all_keywords, all_place_names, errors) = load_all(files_key)
+
+    for error in errors:
+        st.error(error)
+
+    if not valid_files:
+        st.error("No valid XML files were parsed successfully.")
+        st.stop()
+
+    st.header("🔍 Search TEI XML Files")
+
+    search_col1, search_col2, search_col3 = st.columns(3)
+
+    with search_col1:
+        st.markdown("**Search by Author**")
+        selected_author = st.selectbox("Select Author", options=["-- Select Author --"] + all_authors, key="author_select")
+
+    if selected_author != "-- Select Author --":
+        filtered_places = author_to_places[selected_author]
+        filtered_keywords = author_to_keywords[selected_author]
+    else:
+        filtered_places = all_place_names
+        filtered_keywords = all_keywords
+
+    with search_col2:
+        st.markdown("**Search by Place Name**")
+        selected_place = st.selectbox("Select Place", options=["-- Select Place --"] + filtered_places, key="place_select")
+
+    with search_col3:
+        st.markdown("**Search by Keyword**")
+        selected_keyword = st.selectbox("Select Keyword", options=["-- Select Keyword --"] + filtered_keywords, key="keyword_select")
+
+    
+    if st.button("🔎 Search"):
+        st.subheader("🔗 Search Results")
+
+        # The inverted indices were built at load time, so filtering is a
+        # couple of dict lookups and set intersections instead of
+        # re-evaluating XPath on every tree.
+        matched_files = set(valid_files)
+
+        if selected_author != "-- Select Author --":
+            matched_files &= author_to_files.get(selected_author, set())
+
+        if selected_place != "-- Select Place --":
+            matched_files &= place_to_files.get(selected_place, set())
+
+        if selected_keyword != "-- Select Keyword --":
+            matched_files &= keyword_to_files.get(selected_keyword, set())
+
+
+        if matched_files:
+            st.write(f"**Total Matches:** {len(matched_files)}")
+            for file in matched_files:
+                tree = parse_xml(file)
+                # matched_files only holds files that indexed cleanly, and
+                # parse_xml is cached, so this is a lookup, not a re-parse.
+                if tree is None:
+                    continue
+                with st.expander(f"📄 {file.name}"):
+                    display_tei_header(tree)
+
+                    match_details = []
+                    if selected_author != "-- Select Author --":
+                        # The dropdown value is an exact term from the author
+                        # index, so matched files cite it verbatim; no XPath
+                        # substring search needed.
+                        match_details.append(f"Bibliography Author: {selected_author}")
+                    if selected_place != "-- Select Place --":
+                        match_details.extend(search_by_place(tree, selected_place))
+                    if selected_keyword != "-- Select Keyword --":
+                        match_details.extend(search_by_keyword(tree, selected_keyword))
+                    if match_details:
+                        st.markdown("**Matched In:**")
+                        for detail in match_details:
+                            st.write(f"- {detail}")
+
+                    commentaries = get_commentary(tree)
+                    if commentaries:
+                        st.markdown("**Commentary Sections:**")
+                        for idx, comm in enumerate(commentaries, start=1):
+                            st.markdown(f"**Commentary {idx} - {comm['subtype']}**")
+                            st.code(comm['content'], language='xml')
+                              
+                    else:
+                        st.write("No commentary sections found.")
+
+                    editions = get_editions(tree)
+                    if editions:
+                        st.markdown("**Edition Sections:**")
+                        for idx, edition in enumerate(editions, start=1):
+                            st.markdown(f"**Edition {idx} - Language: {edition['lang']}**")
+                            st.code(edition['content'], language='xml')
+                                
+                    else:
+                        st.write("No edition sections found.")
+
+                    associated_places = author_to_places.get(selected_author, []) if selected_author != "-- Select Author --" else get_all_place_names([tree])
+                    associated_keywords = author_to_keywords.get(selected_author, []) if selected_author != "-- Select Author --" else get_all_keywords([tree])
+
+                    if associated_places:
+                        st.markdown("**Associated Places:**")
+                        st.write(", ".join(associated_places))
+                    if associated_keywords:
+                        st.markdown("**Associated Keywords:**")
+                        st.write(", ".join(associated_keywords))
+
+                        
+                    buffer = BytesIO()
+                    tree.write(buffer, pretty_print=True, encoding='utf-8', xml_declaration=True)
+                    buffer.seek(0)
+                    st.download_button(
+                        label="📥 Download XML",
+                        data=buffer,
+                        file_name=f"matched_{file.name}",
+                        mime="application/xml"
+                    )
+        else:
+            st.write("No matching files found for the given search criteria.")
+
+    with st.expander("📚 View All Loaded XML Files"):
+        # Streamlit evaluates an expander's body on every rerun even while it
+        # is closed, so each file is gated behind a checkbox: nothing is
+        # parsed or serialized until the user asks to see that file.
+        for file in valid_files:
+            if not st.checkbox(f"Show {file.name}", key=f"show_{file}"):
+                continue
+            tree = parse_xml(file)
+            if tree is None:
+                continue
+            with st.container():
+                st.markdown(f"### 📄 {file.name}")
+                display_tei_header(tree)
+
+                commentaries = get_commentary(tree)
+                if commentaries:
+                    st.markdown("**Commentary Sections:**")
+                    for idx, comm in enumerate(commentaries, start=1):
+                        st.markdown(f"**Commentary {idx} - {comm['subtype']}**")
+                        st.code(comm['content'], language='xml')
+              
+                else:
+                    st.write("No commentary sections found.")
+
+                editions = get_editions(tree)
+                if editions:
+                    st.markdown("**Edition Sections:**")
+                    for idx, edition in enumerate(editions, start=1):
+                        st.markdown(f"**Edition {idx} - Language: {edition['lang']}**")
+                        st.code(edition['content'], language='xml')
+                       
+                else:
+                    st.write("No edition sections found.")
+
+    st.sidebar.markdown("---")      
+    st.sidebar.header("Simple Querying Interface")
+    st.sidebar.write(
+        "Quickly search and filter TEI XML files to find relevant information or themes."
+    )
+
+    st.sidebar.header("XML Code Viewer")
+    st.sidebar.write(
+        "View detailed XML code for commentaries and editions in their original format."
+    )
+
+    st.sidebar.header("Downloadable Entries")
+    st.sidebar.write(
+        "Download entries for offline access and further analysis."
+    )
+
+    st.sidebar.header("Comprehensive Meta Information")
+    st.sidebar.write(
+        "Each entry includes rich metadata, such as XML file author details."
+    )
+
+  
+
+if __name__ == "__main__":
+    main()